@@ -1,11 +1,193 @@
+import os
 import numpy as np
 import pandas as pd
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 import yfinance as yf
 from tqdm import tqdm
 #
 from ClassStock import Stock
+from utils import njit, prange, max_drawdown_1d, return_stats
+
+# Market index downloads are cached here, one file per symbol and day
+MARKET_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache")
+
+
+@lru_cache(maxsize=None)
+def _download_market_close(symbol, start_iso, end_iso):
+    """
+    'Adj Close' of a market index between two ISO dates. Memoized in-process and
+    on disk, so each symbol is downloaded at most once per day. An empty download
+    raises instead, so it is not cached and the next call retries.
+    """
+    cache_file = os.path.join(
+        MARKET_CACHE_DIR, f"portfolio_market_{symbol}_{end_iso.replace('-', '')}.pkl"
+    )
+    if os.path.exists(cache_file):
+        try:
+            return pd.read_pickle(cache_file)
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable market cache {cache_file}: {e}")
+
+    df = yf.download(symbol, start=start_iso, end=end_iso, interval='1d', progress=False, auto_adjust=False)
+    if df.empty:
+        # raise rather than return, so lru_cache does not memoize a failed download
+        raise ValueError(f"No market data returned for {symbol}")
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    close = df['Adj Close']
+
+    try:
+        os.makedirs(MARKET_CACHE_DIR, exist_ok=True)
+        close.to_pickle(cache_file)
+    except OSError as e:
+        logging.warning(f"Could not write market cache {cache_file}: {e}")
+    return close
+
+
+# Outcome codes for each transaction replayed by _replay
+_TX_UNMATCHED = -1   # date is not a trading day in the price history
+_TX_APPLIED = 0
+_TX_NO_CASH = 1
+_TX_NO_SHARES = 2
+
+
+@njit(cache=True)
+def _replay(P, tx_day_idx, tx_sym_idx, tx_qty, tx_px, tx_side, init_holdings, init_held, init_cash):
+    """
+    Replays transactions day by day over the price matrix P (n_days x n_priced).
+    tx_day_idx must be non-decreasing apart from -1 entries (dates without prices).
+    Symbols with an index >= n_priced are tracked in holdings but have no price.
+    tx_side is 1 for buy, -1 for sell and 0 for anything else.
+    """
+    n_days, n_priced = P.shape
+    n_syms = init_holdings.shape[0]
+    n_tx = tx_day_idx.shape[0]
+
+    holdings = init_holdings.copy()
+    held = init_held.copy()
+    ever_held = init_held.copy()
+    cash = init_cash
+
+    cash_out = np.empty(n_days)
+    value_out = np.full((n_days, n_priced), np.nan)
+    port_val_out = np.empty(n_days)
+    tx_status = np.full(n_tx, _TX_UNMATCHED, dtype=np.int8)
+
+    ptr = 0
+    for d in range(n_days):
+        # transactions are sorted by day: advance one pointer instead of rescanning them all
+        start = ptr
+        while ptr < n_tx and tx_day_idx[ptr] <= d:
+            ptr += 1
+        for j in range(start, ptr):
+            if tx_day_idx[j] != d:
+                continue
+            s = tx_sym_idx[j]
+            if tx_side[j] == 1:
+                cost = tx_qty[j] * tx_px[j]
+                if cash < cost:
+                    tx_status[j] = _TX_NO_CASH
+                    continue
+                cash -= cost
+                holdings[s] += tx_qty[j]
+                held[s] = True
+                ever_held[s] = True
+            elif tx_side[j] == -1:
+                if holdings[s] < tx_qty[j]:
+                    tx_status[j] = _TX_NO_SHARES
+                    continue
+                cash += tx_qty[j] * tx_px[j]
+                holdings[s] -= tx_qty[j]
+                if holdings[s] <= 0:
+                    holdings[s] = 0.0
+                    held[s] = False
+            tx_status[j] = _TX_APPLIED
+
+        day_val = cash
+        for s in range(min(n_syms, n_priced)):
+            if held[s]:
+                stock_val = holdings[s] * P[d, s]
+                day_val += stock_val
+                value_out[d, s] = stock_val
+        cash_out[d] = cash
+        port_val_out[d] = day_val
+
+    return cash_out, value_out, port_val_out, ever_held[:n_priced], tx_status
+
+
+@njit(parallel=True, cache=True, boundscheck=False, error_model='numpy')
+def _mc_kernel(seed, num_days, num_sims, drift, std, dt, S0):
+    """
+    GBM paths (num_sims x num_days) plus per-path Sharpe, Sortino, max drawdown,
+    VaR 95% and CVaR 95% of the daily returns. Each path is seeded with seed + i,
+    so results do not depend on how simulations are spread across threads.
+    Paths are stored as float32 to halve the memory footprint; each path is still
+    compounded in float64 and its metrics are reduced in float64.
+    """
+    paths = np.empty((num_sims, num_days), dtype=np.float32)
+    sharpe = np.full(num_sims, np.nan)
+    sortino = np.full(num_sims, np.nan)
+    mdd = np.full(num_sims, np.nan)
+    var = np.full(num_sims, np.nan)
+    cvar = np.full(num_sims, np.nan)
+    n = num_days - 1
+
+    for i in prange(num_sims):
+        np.random.seed(seed + i)
+        shocks = np.random.standard_normal(num_days)
+        v = S0
+        for d in range(num_days):
+            v *= np.exp(drift * dt + std * shocks[d])
+            paths[i, d] = v
+        if n < 1:
+            continue
+
+        r = np.empty(n)
+        for d in range(n):
+            r[d] = np.float64(paths[i, d + 1]) / np.float64(paths[i, d]) - 1.0
+        mdd[i] = max_drawdown_1d(r)
+
+        mean = r.mean()
+        ss = 0.0
+        neg_n = 0
+        neg_sum = 0.0
+        for d in range(n):
+            ss += (r[d] - mean) ** 2
+            if r[d] < 0:
+                neg_n += 1
+                neg_sum += r[d]
+        # sample std needs at least two returns; drawdown, VaR and CVaR do not
+        if n > 1:
+            sharpe[i] = mean / np.sqrt(ss / (n - 1)) * np.sqrt(252)
+        if neg_n > 1:
+            neg_mean = neg_sum / neg_n
+            neg_ss = 0.0
+            for d in range(n):
+                if r[d] < 0:
+                    neg_ss += (r[d] - neg_mean) ** 2
+            sortino[i] = mean / np.sqrt(neg_ss / (neg_n - 1)) * np.sqrt(252)
+
+        # 5% quantile with linear interpolation (as np.quantile), then the tail mean
+        srt = np.sort(r)
+        h = 0.05 * (n - 1)
+        lo = int(np.floor(h))
+        hi = min(lo + 1, n - 1)
+        q = srt[lo] + (h - lo) * (srt[hi] - srt[lo])
+        var[i] = q
+        tail_sum = 0.0
+        tail_n = 0
+        for d in range(n):
+            if srt[d] <= q:
+                tail_sum += srt[d]
+                tail_n += 1
+            else:
+                break
+        cvar[i] = tail_sum / tail_n
+
+    return paths, sharpe, sortino, mdd, var, cvar
+
 
 class Portfolio:
     """
@@ -15,11 +197,22 @@ class Portfolio:
     def __init__(self, stocks, risk_free_rate, initial_cash):
         self.stocks = stocks  # dictionary: { "Symbol": Stock(...) }
         self.RF = risk_free_rate
+        self._daily_rf = (1.0 + risk_free_rate) ** (1/252) - 1.0
         self.cash_balance = initial_cash
         self.weights = self.getWeights()
 
+        # aligned stock returns: labelled DataFrame plus its (T, N) float64 buffer
+        self._adj_returns_df = None
+        self._returns_mat = None
+        self._sym_index = None
+        self._returns_key = None  # (symbol, returns_version) pairs the cache was built from
+        # cached centered cross-product X^T X of the stock returns
+        self._cov_n = 0
+        self._cov_M2 = None
+
         self.portfolio_returns = None
         self.portfolio_excess_returns = None
+        self._betas = None
         self.market_close = None
         self.simulated_portfolio_values = None
         self.simulated_metrics = None
@@ -42,6 +235,7 @@ class Portfolio:
         """
         Updates the monetary position for a given asset (buy or sell).
         """
+        symbols_before = set(self.stocks)
         if symbol not in self.stocks:
             if not increase:
                 raise ValueError(f"Unable to sell {symbol} that is not in the portfolio.")
@@ -68,6 +262,14 @@ class Portfolio:
         else:
             self.weights = {}
 
+        # invalidate cached return series; the stock returns panel (and its
+        # covariance) only changes when a stock enters or leaves the portfolio
+        if set(self.stocks) != symbols_before:
+            self._resetReturnsCache()
+        self.portfolio_returns = None
+        self.portfolio_excess_returns = None
+        self._betas = None
+
         logging.info(f"Update of {symbol}: qty={quantity}, price={price}, increase={increase}")
 
     def has_stock(self, symbol, quantity):
@@ -108,41 +310,103 @@ class Portfolio:
         weighted = adj_close.mul(w, axis=1)
         return weighted.sum(axis=1)
 
-    def getReturns(self):
+    def getStockReturns(self):
         """
-        Daily returns of each stock (pct_change) + 'Portfolio' column.
+        Daily returns of each stock (pct_change of 'Adj Close'), built only on demand.
+        Use getPortfolioReturns when only the portfolio series is needed.
         """
         prices = self.getAdjClosePrices()
         if prices.empty:
             logging.warning("No price data to calculate returns.")
             return pd.DataFrame()
+        return prices.pct_change()
 
-        stock_returns = prices.pct_change()
-        p_return_series = self.getPortfolioReturns()
-        stock_returns["Portfolio"] = p_return_series
+    def getReturns(self):
+        """
+        Daily returns of each stock (pct_change) + 'Portfolio' column.
+        """
+        stock_returns = self.getStockReturns()
+        if stock_returns.empty:
+            return stock_returns
+        stock_returns["Portfolio"] = self.getPortfolioReturns()
         return stock_returns
 
+    def _resetReturnsCache(self):
+        self._adj_returns_df = None
+        self._returns_mat = None
+        self._sym_index = None
+        self._returns_key = None
+        self._cov_n = 0
+        self._cov_M2 = None
+
+    def _returnsKey(self):
+        return tuple((sym, st.returns_version) for sym, st in self.stocks.items())
+
+    def invalidateReturnsCache(self):
+        """
+        Drops every cached return series and the statistics derived from them.
+        Called automatically when a stock's adjusted return/volatility is changed.
+        """
+        self._resetReturnsCache()
+        self.portfolio_returns = None
+        self.portfolio_excess_returns = None
+        self._betas = None
+
+    def _checkReturnsCache(self):
+        """
+        Invalidates the caches if any stock's adjusted returns changed since they were built.
+        """
+        if self._returns_key is not None and self._returns_key != self._returnsKey():
+            self.invalidateReturnsCache()
+
+    def _rebuild_returns_matrix(self):
+        """
+        Aligns the adjusted returns of all stocks (dates where every stock has data)
+        into one DataFrame and keeps its contiguous (T, N) array and column mapping.
+        """
+        series = [st.getAdjustedReturns().rename(sym) for sym, st in self.stocks.items()]
+        series = [r for r in series if not r.empty]
+        df = pd.concat(series, axis=1).dropna() if series else pd.DataFrame()
+        self._adj_returns_df = df
+        self._returns_mat = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+        self._sym_index = {sym: i for i, sym in enumerate(df.columns)}
+        self._returns_key = self._returnsKey()
+
+    def _get_adj_returns_df(self):
+        """
+        DataFrame with the adjusted returns of each stock (cached until the holdings
+        or a stock's adjusted returns change).
+        """
+        self._checkReturnsCache()
+        if self._adj_returns_df is None:
+            self._rebuild_returns_matrix()
+        return self._adj_returns_df
+
+    def _weightsVector(self):
+        """
+        Weights as an array ordered like the columns of the returns matrix.
+        """
+        self._get_adj_returns_df()
+        return np.array([self.weights.get(sym, 0.0) for sym in self._sym_index])
+
     def getAdjustedReturns(self):
         """
         If any stock has adjusted returns, merges everything and does a dot with weights
         to get the portfolio return series.
         """
-        df = pd.DataFrame()
-        for st in self.stocks.values():
-            r = st.getAdjustedReturns()
-            if not r.empty:
-                df[st.symbol] = r
+        df = self._get_adj_returns_df()
         if df.empty:
             logging.warning("No adjusted returns for the portfolio.")
             return pd.Series(dtype=float)
 
-        w = pd.Series(self.weights)
-        return df.dot(w)
+        return pd.Series(self._returns_mat @ self._weightsVector(), index=df.index)
 
     def getPortfolioReturns(self):
         """
-        Daily returns for the portfolio (cached if already calculated).
+        Daily returns for the portfolio (cached if already calculated), computed as
+        returns matrix @ weights without materializing per-stock price returns.
         """
+        self._checkReturnsCache()
         if self.portfolio_returns is not None:
             return self.portfolio_returns
 
@@ -158,6 +422,7 @@ class Portfolio:
         """
         Portfolio return - daily risk-free rate.
         """
+        self._checkReturnsCache()
         if self.portfolio_excess_returns is not None:
             return self.portfolio_excess_returns
         pr = self.getPortfolioReturns().dropna()
@@ -165,57 +430,64 @@ class Portfolio:
             self.portfolio_excess_returns = pd.Series(dtype=float)
             return self.portfolio_excess_returns
 
-        daily_rf = (1 + self.RF) ** (1/252) - 1
-        self.portfolio_excess_returns = pr - daily_rf
+        self.portfolio_excess_returns = pr - self._daily_rf
         return self.portfolio_excess_returns
 
     def getPortfolioSharpe(self):
-        er = self.getPortfolioExcessReturns().dropna()
-        std_dev = er.std()
+        er = self.getPortfolioExcessReturns().dropna().to_numpy(dtype=np.float64)
+        mean_, std_dev, _ = return_stats(er)
         if std_dev == 0 or np.isnan(std_dev):
             return np.nan
-        return er.mean() / std_dev * np.sqrt(252)
+        return mean_ / std_dev * np.sqrt(252)
 
     def getPortfolioSortino(self):
-        er = self.getPortfolioExcessReturns().dropna()
-        negative = er[er < 0]
-        if negative.empty or negative.std() == 0:
+        er = self.getPortfolioExcessReturns().dropna().to_numpy(dtype=np.float64)
+        mean_, _, neg_std = return_stats(er)
+        if neg_std == 0 or np.isnan(neg_std):
             return np.nan
-        return er.mean() / negative.std() * np.sqrt(252)
+        return mean_ / neg_std * np.sqrt(252)
 
     def getPortfolioStdDev(self):
-        rr = self.getPortfolioReturns().dropna()
-        if rr.empty:
-            return np.nan
-        return rr.std() * np.sqrt(252)
+        self._get_adj_returns_df()
+        rr = self._returns_mat @ self._weightsVector()
+        std_dev = return_stats(rr)[1]
+        return std_dev * np.sqrt(252)
+
+    def _init_cov(self):
+        """
+        Caches the centered cross-product X^T X of the returns matrix and its row count.
+        """
+        self._get_adj_returns_df()
+        arr = self._returns_mat
+        self._cov_n = arr.shape[0]
+        X = arr - arr.mean(axis=0) if self._cov_n else arr
+        self._cov_M2 = X.T @ X
 
     def getPortfolioCovarianceMatrix(self):
         """
         Covariance matrix of the daily returns of each stock.
         """
-        df = pd.DataFrame()
-        for st in self.stocks.values():
-            r = st.getAdjustedReturns()
-            if not r.empty:
-                df[st.symbol] = r
-        df.dropna(inplace=True)
-        if df.empty:
+        self._checkReturnsCache()
+        if self._cov_M2 is None:
+            self._init_cov()
+        if self._cov_n == 0:
             return pd.DataFrame()
-        return df.cov()
+        if self._cov_n < 2:
+            cov = np.full_like(self._cov_M2, np.nan)
+        else:
+            cov = self._cov_M2 / (self._cov_n - 1)
+        symbols = list(self._sym_index)
+        return pd.DataFrame(cov, index=symbols, columns=symbols)
 
     def getCorrelationMatrix(self):
         """
         Correlation matrix of the daily returns of each stock.
         """
-        df = pd.DataFrame()
-        for st in self.stocks.values():
-            r = st.getAdjustedReturns()
-            if not r.empty:
-                df[st.symbol] = r
-        df.dropna(inplace=True)
+        df = self._get_adj_returns_df()
         if df.empty:
             return pd.DataFrame()
-        return df.corr()
+        corr = np.atleast_2d(np.corrcoef(self._returns_mat, rowvar=False))
+        return pd.DataFrame(corr, index=df.columns, columns=df.columns)
 
     def getMarginalContributionToRisk(self):
         """
@@ -224,12 +496,12 @@ class Portfolio:
         cov = self.getPortfolioCovarianceMatrix()
         if cov.empty:
             return pd.Series(dtype=float)
-        w = np.array([self.weights[sym] for sym in self.stocks])
+        w = self._weightsVector()
         port_daily_vol = self.getPortfolioStdDev() / np.sqrt(252)
         if port_daily_vol == 0 or np.isnan(port_daily_vol):
             return pd.Series(dtype=float)
-        mctr_ = cov.dot(w) / port_daily_vol
-        return pd.Series(mctr_, index=self.stocks.keys())
+        mctr_ = cov.to_numpy() @ w / port_daily_vol
+        return pd.Series(mctr_, index=cov.index)
 
     def getComponentContributionToRisk(self):
         """
@@ -239,18 +511,34 @@ class Portfolio:
         w_s = pd.Series(self.weights)
         return w_s * mctr
 
+    def getLeaveOneOutStdDevs(self):
+        """
+        Annualized volatility of the portfolio without each asset (remaining weights
+        renormalized), for all assets at once from the covariance matrix:
+        var_-i = (w'Sw - 2 w_i (Sw)_i + w_i^2 S_ii) / (W - w_i)^2, with W = sum(w).
+        S is estimated on the dates every stock shares, so removing the stock with the
+        shortest history does not extend the window to the others' longer history.
+        """
+        cov = self.getPortfolioCovarianceMatrix()
+        if cov.empty:
+            return pd.Series(dtype=float)
+        S = cov.to_numpy()
+        w = self._weightsVector()
+        Sw = S @ w
+        rest = w.sum() - w
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var_noi = (w @ Sw - 2 * w * Sw + w ** 2 * np.diag(S)) / rest ** 2
+        std_noi = np.sqrt(np.maximum(var_noi, 0.0)) * np.sqrt(252)
+        std_noi[rest <= 0] = np.nan
+        return pd.Series(std_noi, index=cov.index)
+
     def simulatePortfolioWithoutAsset(self, symbol):
         """
         Simulates the portfolio's volatility by removing an asset.
         """
         if symbol not in self.weights:
             return np.nan
-        new_stocks = {s: obj for s, obj in self.stocks.items() if s != symbol}
-        if not new_stocks:
-            return np.nan
-        from ClassPortfolio import Portfolio
-        testp = Portfolio(new_stocks, self.RF, self.cash_balance)
-        return testp.getPortfolioStdDev()
+        return self.getLeaveOneOutStdDevs().get(symbol, np.nan)
 
     def getAssetImpactOnVolatility(self, symbol):
         """
@@ -266,44 +554,43 @@ class Portfolio:
         pr = self.getPortfolioReturns().dropna()
         if pr.empty:
             return np.nan
-        cum = (1 + pr).cumprod()
-        peak = cum.expanding().max()
-        dd = (cum / peak) - 1
-        return dd.min()
+        return max_drawdown_1d(pr.to_numpy(dtype=np.float64))
+
+    def _getVaRCVaR(self, cl=0.05):
+        """
+        VaR (the k-th smallest return, k = cl * n) and CVaR (mean of the returns up to
+        and including it) from a single O(n) partial sort.
+        """
+        arr = self.getPortfolioReturns().dropna().to_numpy()
+        if arr.size == 0:
+            return np.nan, np.nan
+        k = min(int(cl * arr.size), arr.size - 1)
+        part = np.partition(arr, k)
+        return part[k], part[:k + 1].mean()
 
     def getVaR(self, cl=0.05):
         """
         Value at Risk based on the percentile.
         """
-        pr = self.getPortfolioReturns().dropna()
-        if pr.empty:
-            return np.nan
-        return np.percentile(pr, cl * 100)
+        return self._getVaRCVaR(cl)[0]
 
     def getCVaR(self, cl=0.05):
         """
         Conditional VaR (ES).
         """
-        pr = self.getPortfolioReturns().dropna()
-        if pr.empty:
-            return np.nan
-        var_ = self.getVaR(cl)
-        return pr[pr <= var_].mean()
+        return self._getVaRCVaR(cl)[1]
 
     def getMarketData(self, symbol='^GSPC'):
         """
-        Downloads the market index to calculate Beta.
+        Downloads the market index to calculate Beta (cached per symbol and day).
         """
         end_ = datetime.today()
         start_ = end_ - timedelta(days=365)
+        self._betas = None
         try:
-            df = yf.download(symbol, start=start_, end=end_, interval='1d', progress=False, auto_adjust=False)
-            if df.empty:
-                self.market_close = pd.Series(dtype=float)
-            else:
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = df.columns.get_level_values(0)
-                self.market_close = df['Adj Close']
+            self.market_close = _download_market_close(
+                symbol, start_.strftime("%Y-%m-%d"), end_.strftime("%Y-%m-%d")
+            )
         except Exception as e:
             logging.error(f"Error fetching market data {symbol}: {e}")
             self.market_close = pd.Series(dtype=float)
@@ -319,18 +606,57 @@ class Portfolio:
             return pd.Series(dtype=float)
         return self.market_close.pct_change()
 
+    def _getBetas(self):
+        """
+        Betas of the portfolio and of each stock against the market (cached).
+        Each stock's beta uses its historical returns on every date it shares with
+        the market (pairwise-complete rows), so it does not depend on the other
+        holdings or on what-if adjustments; the portfolio beta uses the dates all
+        stocks share.
+        """
+        self._checkReturnsCache()
+        if self._betas is not None:
+            return self._betas
+
+        # fetch market data first: getMarketData resets the cached betas
+        mr = self.getMarketReturns()
+        df = self._get_adj_returns_df()
+        self._betas = (np.nan, pd.Series(dtype=float))
+        if mr.empty:
+            return self._betas
+
+        # stocks: one stacked (T, N) matrix on the market dates, NaN where a stock has no data
+        symbols = list(self.stocks)
+        Y = np.column_stack([
+            st.getReturns().dropna().reindex(mr.index).to_numpy(dtype=np.float64)
+            for st in self.stocks.values()
+        ]) if symbols else np.empty((len(mr), 0))
+        m = mr.to_numpy(dtype=np.float64)[:, None]
+        V = ~np.isnan(Y) & ~np.isnan(m)
+        n = V.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dm = np.where(V, m - np.where(V, m, 0.0).sum(axis=0) / n, 0.0)
+            dy = np.where(V, Y - np.where(V, Y, 0.0).sum(axis=0) / n, 0.0)
+            mm = (dm * dm).sum(axis=0)
+            stock_betas = (dm * dy).sum(axis=0) / mm
+        stock_betas[(n < 2) | (mm == 0)] = np.nan
+        stock_betas = pd.Series(stock_betas, index=symbols)
+
+        # portfolio: single covariance over the dates every stock shares
+        port_beta = np.nan
+        if not df.empty:
+            m_common = mr.reindex(df.index).to_numpy(dtype=np.float64)
+            valid = ~np.isnan(m_common)
+            if valid.sum() >= 2:
+                C = np.cov(m_common[valid], self._returns_mat[valid] @ self._weightsVector())
+                if C[0, 0] != 0:
+                    port_beta = C[0, 1] / C[0, 0]
+
+        self._betas = (port_beta, stock_betas)
+        return self._betas
+
     def getPortfolioBeta(self):
-        pr = self.getPortfolioReturns().dropna()
-        mr = self.getMarketReturns().loc[pr.index].dropna()
-        df = pd.DataFrame({'p': pr, 'm': mr}).dropna()
-        if df.empty:
-            return np.nan
-        c = np.cov(df['p'], df['m'])
-        pm = c[0][1]
-        mm = c[1][1]
-        if mm == 0:
-            return np.nan
-        return pm / mm
+        return self._getBetas()[0]
 
     def getTreynorRatio(self):
         b = self.getPortfolioBeta()
@@ -343,15 +669,22 @@ class Portfolio:
         """
         Creates a DataFrame with detailed statistics for each stock in the portfolio.
         """
+        # portfolio-level quantities are computed once and shared by every row
+        loo_std = self.getLeaveOneOutStdDevs()
+        mctr_all = self.getMarginalContributionToRisk()
+        ctr_all = self.getComponentContributionToRisk()
+        orig_std = self.getPortfolioStdDev()
+        stock_betas = self._getBetas()[1]
+
         rows = []
         for st in tqdm(self.stocks.values(), desc="Processing stocks"):
             sym = st.symbol
-            beta = st.getBeta()
+            beta = st.getBeta(estimate=stock_betas.get(sym, np.nan))
             sharpe = st.getSharpeRatio()
             sortino = st.getSortinoRatio()
-            impact = self.getAssetImpactOnVolatility(sym)
-            mctr = self.getMarginalContributionToRisk().get(sym, np.nan)
-            ctr = self.getComponentContributionToRisk().get(sym, np.nan)
+            impact = orig_std - loo_std.get(sym, np.nan)
+            mctr = mctr_all.get(sym, np.nan)
+            ctr = ctr_all.get(sym, np.nan)
 
             try:
                 c = st.getClose()
@@ -440,67 +773,60 @@ class Portfolio:
             return pd.DataFrame()
 
         all_dates = prices_df.index.sort_values().unique()
-        transaction_log = transaction_log.sort_values("Date")
-
         if not pd.api.types.is_datetime64_any_dtype(transaction_log["Date"]):
-            transaction_log["Date"] = pd.to_datetime(transaction_log["Date"])
-
-        portfolio_values = []
-        current_cash = self.cash_balance
-        current_holdings = {}
+            transaction_log = transaction_log.assign(Date=pd.to_datetime(transaction_log["Date"]))
+        transaction_log = transaction_log.sort_values("Date", kind="stable")
+
+        # Flatten prices and transactions into arrays once, then replay in a compiled loop
+        P = prices_df.reindex(all_dates).to_numpy(dtype=np.float64)
+        symbols = list(prices_df.columns)
+        n_priced = len(symbols)
+        sym_idx = {s_: i for i, s_ in enumerate(symbols)}
+        for sym in list(self.stocks) + list(transaction_log["Symbol"]):
+            if sym not in sym_idx:
+                sym_idx[sym] = len(symbols)
+                symbols.append(sym)
+
+        init_holdings = np.zeros(len(symbols))
+        init_held = np.zeros(len(symbols), dtype=np.bool_)
         for sym, st in self.stocks.items():
-            current_holdings[sym] = st.quantity
-
-        for day in all_dates:
-            day_txs = transaction_log[transaction_log["Date"] == day]
-
-            for _, tx in day_txs.iterrows():
-                ttype = tx["Type"].lower()
-                tsym = tx["Symbol"]
-                qty = tx["Quantity"]
-                px = tx["Price"]
-
-                if ttype == 'buy':
-                    cost = qty * px
-                    if current_cash < cost:
-                        logging.error("Not enough cash to buy.")
-                        continue
-                    current_cash -= cost
-                    current_holdings[tsym] = current_holdings.get(tsym, 0.0) + qty
-                elif ttype == 'sell':
-                    if current_holdings.get(tsym, 0.0) < qty:
-                        logging.error("Not enough shares to sell.")
-                        continue
-                    revenue = qty * px
-                    current_cash += revenue
-                    current_holdings[tsym] -= qty
-                    if current_holdings[tsym] <= 0:
-                        del current_holdings[tsym]
-
-            day_val = current_cash
-            row_dict = {"Date": day, "Cash": current_cash}
-            for s_, q_ in current_holdings.items():
-                if s_ not in prices_df.columns:
-                    continue
-                if day not in prices_df.index:
-                    continue
-                px_today = prices_df.loc[day, s_]
-                stock_val = q_ * px_today
-                day_val += stock_val
-                if by_stock:
-                    row_dict[s_] = stock_val
+            init_holdings[sym_idx[sym]] = st.quantity
+            init_held[sym_idx[sym]] = True
+
+        ttypes = transaction_log["Type"].str.lower().to_numpy()
+        syms_arr = transaction_log["Symbol"].to_numpy()
+        tx_side = np.where(ttypes == 'buy', 1, np.where(ttypes == 'sell', -1, 0)).astype(np.int8)
+        tx_day_idx = all_dates.get_indexer(transaction_log["Date"]).astype(np.int64)
+        tx_sym_idx = np.array([sym_idx[s_] for s_ in syms_arr], dtype=np.int64)
+        tx_qty = transaction_log["Quantity"].to_numpy(dtype=np.float64)
+        tx_px = transaction_log["Price"].to_numpy(dtype=np.float64)
+
+        cash_out, value_out, port_val_out, ever_held, tx_status = _replay(
+            P, tx_day_idx, tx_sym_idx, tx_qty, tx_px, tx_side,
+            init_holdings, init_held, float(self.cash_balance)
+        )
 
-            row_dict["PortfolioValue"] = day_val
-            portfolio_values.append(row_dict)
+        for status in tx_status:
+            if status == _TX_NO_CASH:
+                logging.error("Not enough cash to buy.")
+            elif status == _TX_NO_SHARES:
+                logging.error("Not enough shares to sell.")
+
+        dyn_df = pd.DataFrame({"Date": all_dates, "Cash": cash_out})
+        if by_stock:
+            for i in range(n_priced):
+                if ever_held[i]:
+                    dyn_df[symbols[i]] = value_out[:, i]
+        dyn_df["PortfolioValue"] = port_val_out
 
-        dyn_df = pd.DataFrame(portfolio_values)
         dyn_df.sort_values("Date", inplace=True)
         dyn_df.reset_index(drop=True, inplace=True)
         return dyn_df
 
-    def monteCarloSimulation(self, num_simulations=1000, num_days=252):
+    def monteCarloSimulation(self, num_simulations=1000, num_days=252, seed=42):
         """
         Monte Carlo simulation at the portfolio level using GBM from the distribution of daily returns.
+        Paths and their metrics are computed in parallel by _mc_kernel (path i is seeded with seed + i).
         """
         portfolio_returns = self.getPortfolioReturns().dropna()
         if portfolio_returns.empty:
@@ -513,13 +839,12 @@ class Portfolio:
         dt = 1 / 252
         last_port_val = sum(st.getAmount() for st in self.stocks.values())
 
-        sim_array = np.zeros((num_days, num_simulations))
-        for i in range(num_simulations):
-            np.random.seed(i)
-            shocks = np.random.normal(0, std_dev, num_days)
-            daily_ret = np.exp(drift * dt + shocks)
-            port_path = last_port_val * np.cumprod(daily_ret)
-            sim_array[:, i] = port_path
+        # fixed argument types, so every run reuses the same cached compiled kernel
+        paths, sharpe_, sortino_, mdd_, var_, cvar_ = _mc_kernel(
+            int(seed), int(num_days), int(num_simulations),
+            float(drift), float(std_dev), float(dt), float(last_port_val)
+        )
+        sim_array = paths.T
 
         if len(portfolio_returns.index) == 0:
             last_date = datetime.today()
@@ -534,31 +859,20 @@ class Portfolio:
         )
         self.simulated_portfolio_values = sim_df
 
-        # Compute metrics
-        ret_ = sim_df.pct_change().dropna(how='all')
-        sharpe_ = ret_.mean(axis=0) / ret_.std(axis=0) * np.sqrt(252)
-        negative_only = ret_[ret_ < 0]
-        sortino_ = ret_.mean(axis=0) / negative_only.std(axis=0) * np.sqrt(252)
-        mdd_ = sim_df.apply(lambda x: self.calculate_max_drawdown(x), axis=0)
-        var_ = ret_.quantile(0.05, axis=0)
-        cvar_ = ret_.apply(lambda x: x[x <= x.quantile(0.05)].mean(), axis=0)
-
         self.simulated_metrics = pd.DataFrame({
             "Simulation": sim_df.columns,
-            "Sharpe Ratio": sharpe_.values,
-            "Sortino Ratio": sortino_.values,
-            "Max Drawdown": mdd_.values,
-            "VaR 95%": var_.values,
-            "CVaR 95%": cvar_.values
+            "Sharpe Ratio": sharpe_,
+            "Sortino Ratio": sortino_,
+            "Max Drawdown": mdd_,
+            "VaR 95%": var_,
+            "CVaR 95%": cvar_
         })
         return sim_df
 
     @staticmethod
     def calculate_max_drawdown(series):
-        cumret = (1 + series.pct_change()).cumprod()
-        peak = cumret.expanding().max()
-        dd = (cumret / peak) - 1
-        return dd.min()
+        arr = series.dropna().to_numpy(dtype=np.float64)
+        return max_drawdown_1d(arr[1:] / arr[:-1] - 1.0)
 
     def getSimulatedMetrics(self):
         """
@@ -22,6 +22,8 @@ class Stock:
         self.adjusted_beta = None
         self.adjusted_volatility = None
         self.adjusted_return = None
+        # bumped whenever getAdjustedReturns() would change, so portfolios can drop cached returns
+        self.returns_version = 0
 
         # Estimated number of shares based on "value / last price"
         self.quantity = 0.0
@@ -81,13 +83,16 @@ class Stock:
             logging.error(f"Error fetching info for {self.symbol}: {e}")
             return {}
 
-    def getBeta(self):
+    def getBeta(self, estimate=np.nan):
         """
-        If an adjusted beta has been set, returns it. Otherwise,
-        attempts to fetch it from the .info property in yfinance.
+        If an adjusted beta has been set, returns it. Otherwise returns the
+        given estimate (e.g. a regression against the market) if it is not NaN,
+        and finally attempts to fetch it from the .info property in yfinance.
         """
         if self.adjusted_beta is not None:
             return self.adjusted_beta
+        if not np.isnan(estimate):
+            return estimate
         beta = self.getInfo().get('beta', np.nan)
         return beta
 
@@ -124,12 +129,14 @@ class Stock:
         Manually sets an (annual) expected return for custom simulations.
         """
         self.adjusted_return = expected_return
+        self.returns_version += 1
 
     def setAdjustedVolatility(self, volatility):
         """
         Manually sets an (annual) volatility for custom simulations.
         """
         self.adjusted_volatility = volatility
+        self.returns_version += 1
 
     def getAdjustedReturns(self):
         """
@@ -68,17 +68,24 @@ class Transactions:
         if not all(c in df.columns for c in required):
             raise ValueError(f"Transactions sheet must contain columns: {required}")
 
-        for _, row in df.iterrows():
+        # iterate over plain column lists rather than boxing every row with iterrows
+        dates = df['Date'].astype(str).tolist()
+        symbols = df['Symbol'].tolist()
+        types = df['Type'].tolist()
+        quantities = df['Quantity'].tolist()
+        prices = df['Price'].tolist()
+
+        for i in range(len(df)):
             try:
                 self.record_transaction(
-                    date=str(row['Date']),
-                    symbol=row['Symbol'],
-                    transaction_type=row['Type'].lower(),
-                    quantity=row['Quantity'],
-                    price=row['Price']
+                    date=dates[i],
+                    symbol=symbols[i],
+                    transaction_type=types[i].lower(),
+                    quantity=quantities[i],
+                    price=prices[i]
                 )
             except Exception as e:
-                logging.error(f"Error processing transaction row: {row.to_dict()}, e={e}")
+                logging.error(f"Error processing transaction row: {df.iloc[i].to_dict()}, e={e}")
 
     def get_transaction_log(self):
         # Return a copy or direct reference if you prefer
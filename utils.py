@@ -1,22 +1,107 @@
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional: without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+    prange = range
+
+
+@njit(cache=True)
+def max_drawdown_1d(r):
+    """
+    Maximum drawdown of a series of daily returns, in a single pass.
+    """
+    if r.size == 0:
+        return np.nan
+    cum = 1.0
+    peak = 0.0
+    mdd = 0.0
+    for x in r:
+        cum *= (1.0 + x)
+        if cum > peak:
+            peak = cum
+        dd = cum / peak - 1.0
+        if dd < mdd:
+            mdd = dd
+    return mdd
+
+
+@njit(cache=True)
+def max_drawdown_2d(mat):
+    """
+    Maximum drawdown of each column of a (num_days x num_series) matrix of daily returns.
+    Walks the rows of the C-contiguous matrix, keeping a running cum/peak/mdd per column,
+    so memory is read sequentially.
+    """
+    n_rows, n_cols = mat.shape
+    if n_rows == 0:
+        return np.full(n_cols, np.nan)
+    cum = np.ones(n_cols)
+    peak = np.zeros(n_cols)
+    mdd = np.zeros(n_cols)
+    for t in range(n_rows):
+        for j in range(n_cols):
+            cum[j] *= (1.0 + mat[t, j])
+            if cum[j] > peak[j]:
+                peak[j] = cum[j]
+            dd = cum[j] / peak[j] - 1.0
+            if dd < mdd[j]:
+                mdd[j] = dd
+    return mdd
+
+
+@njit(cache=True)
+def return_stats(r):
+    """
+    Mean, sample std and sample std of the negative values of a 1D array of returns,
+    in a single pass (Welford updates). Statistics that are undefined are NaN.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    neg_n = 0
+    neg_mean = 0.0
+    neg_m2 = 0.0
+    for x in r:
+        n += 1
+        d = x - mean
+        mean += d / n
+        m2 += d * (x - mean)
+        if x < 0:
+            neg_n += 1
+            d = x - neg_mean
+            neg_mean += d / neg_n
+            neg_m2 += d * (x - neg_mean)
+    mean_out = mean if n > 0 else np.nan
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+    neg_std = np.sqrt(neg_m2 / (neg_n - 1)) if neg_n > 1 else np.nan
+    return mean_out, std, neg_std
+
+
 def calculate_simulated_metrics(sim_df):
     """
     Utility function that, given a DataFrame of simulations (num_days x num_simulations),
     returns a DataFrame with Sharpe, Sortino, Max Drawdown, VaR, and CVaR metrics 
     for each column (simulation).
     """
-    ret_ = sim_df.pct_change().dropna(how='all')  # daily returns
+    sim_arr = sim_df.to_numpy(dtype=np.float64)
+    ret_ = sim_arr[1:] / sim_arr[:-1] - 1.0  # daily returns (simulated paths have no NaNs)
+    mdd_all = dict(zip(sim_df.columns, max_drawdown_2d(ret_)))
     sharpe_ = {}
     sortino_ = {}
     mdd_ = {}
     var_ = {}
     cvar_ = {}
 
-    for col in sim_df.columns:
-        series = sim_df[col].pct_change().dropna()
-        if series.empty:
+    for j, col in enumerate(sim_df.columns):
+        series = ret_[:, j]
+        if series.size == 0:
             sharpe_[col] = None
             sortino_[col] = None
             mdd_[col] = None
@@ -25,7 +110,7 @@ def calculate_simulated_metrics(sim_df):
             continue
 
         mean_ = series.mean()
-        std_ = series.std()
+        std_ = series.std(ddof=1) if series.size > 1 else np.nan
 
         # Sharpe
         if std_ == 0:
@@ -35,22 +120,20 @@ def calculate_simulated_metrics(sim_df):
 
         # Sortino
         negative = series[series < 0]
-        if negative.empty or negative.std() == 0:
+        neg_std = negative.std(ddof=1) if negative.size > 1 else np.nan
+        if negative.size == 0 or neg_std == 0:
             sortino_[col] = None
         else:
-            sortino_[col] = (mean_ / negative.std()) * np.sqrt(252)
+            sortino_[col] = (mean_ / neg_std) * np.sqrt(252)
 
         # Max Drawdown
-        cum = (1 + series).cumprod()
-        peak = cum.expanding().max()
-        dd = (cum / peak) - 1
-        mdd_[col] = dd.min()
+        mdd_[col] = mdd_all[col]
 
         # VaR and CVaR
-        q95 = series.quantile(0.05)
+        q95 = np.quantile(series, 0.05)
         var_[col] = q95
         in_tail = series[series <= q95]
-        cvar_[col] = in_tail.mean() if not in_tail.empty else None
+        cvar_[col] = in_tail.mean() if in_tail.size else None
 
     df_out = pd.DataFrame({
         "Simulation": sim_df.columns,